@@ -1,11 +1,11 @@
 import click
 import fiona
 import rasterio
-from shapely.geometry import Point, LineString, shape, mapping
-from drapery.ops.sample import sample
+from shapely.geometry import Point, shape, mapping
 
 import surficial as srf
 from surficial.tools import messages
+from surficial.tools.io import drape_lines
 
 
 @click.command()
@@ -42,7 +42,7 @@ def identify(ctx, alignment, output, surface, densify, min_slope, min_drop, up):
 
     if surface:
         with rasterio.open(surface) as height_src:
-            lines = [LineString(sample(height_src, line.coords)) for line in lines]
+            lines = drape_lines(height_src, lines)
 
     network = srf.Alignment()
     network.add_geometries(lines)
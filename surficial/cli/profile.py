@@ -2,14 +2,14 @@ import click
 import rasterio
 import fiona
 import matplotlib.pyplot as plt
-from shapely.geometry import Point, LineString
+from shapely.geometry import Point
 from pyproj.crs import CRS
 from adjustText import adjust_text
 
 from drapery.ops.sample import sample
 import surficial as srf
 from surficial.tools import defaults, messages
-from surficial.tools.io import read_geometries, read_crs, load_style
+from surficial.tools.io import read_geometries, read_crs, load_style, drape_lines
 from surficial.tools.plotting import cols_to_linecollection, df_extents, pad_extents
 
 
@@ -61,7 +61,8 @@ def profile(ctx, alignment, surface, point_layers, style,
 
     if surface:
         with rasterio.open(surface) as height_src:
-            line_features = [(fid, LineString(sample(height_src, line.coords))) for fid, line in line_features]
+            draped = drape_lines(height_src, [line for _, line in line_features])
+            line_features = [(fid, line) for (fid, _), line in zip(line_features, draped)]
 
     network = srf.Alignment()
     network.add_geometries(line_features)
@@ -101,10 +102,12 @@ def profile(ctx, alignment, surface, point_layers, style,
 
             point_features = read_geometries(point_src)
 
-            if point_src.schema['geometry'] != "3D Point":
+            if point_src.schema['geometry'] != "3D Point" and point_features:
                 with rasterio.open(surface) as height_src:
-                    point_features = [(fid, Point(sample(height_src, [(point.x, point.y)])))
-                                   for fid, point in point_features]
+                    # sample every point in one raster read rather than one per point
+                    sampled = sample(height_src, [(point.x, point.y) for _, point in point_features])
+                    point_features = [(fid, Point(xyz))
+                                   for (fid, _), xyz in zip(point_features, sampled)]
 
             hits = srf.points_to_addresses(network, point_features, radius, reverse=False)
             addresses = srf.get_path_distances(hits, edge_addresses)
@@ -3,16 +3,18 @@ from __future__ import annotations
 import sys
 import warnings
 import inspect
+from itertools import islice
 from typing import Union, Optional, Iterable
 
 import networkx as nx
 from networkx import DiGraph
+import numpy as np
 import pandas as pnd
 
 from shapely.geometry import Point, LineString, MultiLineString
 from shapely.ops import transform, unary_union
-from surficial.ops.graph import extend_edge, get_neighbor_edge
-from surficial.ops.shape import measure, linestring_to_vertices, linestring_to_stations
+from surficial.ops.graph import get_neighbor_edge
+from surficial.ops.shape import measure_lines, linestring_to_vertices, linestring_to_stations
 
 ISOLATED_NODES = "Found isolated nodes. Use the repair subcommand to check. Exiting now."
 MULTIPLE_SUBGRAPHS = "Found multiple subgraphs. Use the repair subcommand to check. Exiting now."
@@ -37,31 +39,35 @@ class Alignment(DiGraph):
             directed network graph
 
         """
-        # add the nodes
+        # add the nodes, keeping an xy-keyed map for endpoint matching
         endpoints = []
         for _, line in lines:
             endpoints.append(line.coords[0])
             endpoints.append(line.coords[-1])
+        node_ids = {}
         for i, p in enumerate(set(endpoints)):
             self.add_node(i, geom=Point(p))
-
-        # add the edges
-        for _, line in lines:
-            from_node = None
-            to_node = None
-            for n, data in self.nodes(data=True):
-                p = data['geom']
-                if p.equals(Point(line.coords[0])):
-                    from_node = n
-                elif p.equals(Point(line.coords[-1])):
-                    to_node = n
-            self.add_edge(from_node, to_node, geom=line, len=line.length, meas=measure(line))
-
-        if nx.number_of_isolates(self) > 1:
+            node_ids[p[:2]] = i
+
+        # add the edges in one bulk insert; coords and meas are kept as
+        # arrays so address lookups need not re-enter GEOS per access
+        measures = measure_lines([line for _, line in lines])
+        # len is the last vertex measure so path distances stay bit-exact
+        # with the cached meas arrays at edge boundaries
+        edge_records = [(node_ids[line.coords[0][:2]],
+                         node_ids[line.coords[-1][:2]],
+                         {'geom': line, 'len': meas[-1],
+                          'meas': np.asarray(meas),
+                          'coords': np.asarray(line.coords)})
+                        for (_, line), meas in zip(lines, measures)]
+        self.add_edges_from(edge_records)
+
+        if sum(1 for _ in islice(nx.isolates(self), 2)) > 1:
             warnings.warn(ISOLATED_NODES)
-    
-        if nx.number_connected_components(self.to_undirected()) > 1:
-            print([len(c) for c in sorted(nx.connected_components(self.to_undirected()), key=len, reverse=True)])
+
+        component_sizes = [len(c) for c in nx.weakly_connected_components(self)]
+        if len(component_sizes) > 1:
+            print(sorted(component_sizes, reverse=True))
             warnings.warn(MULTIPLE_SUBGRAPHS)
             # sys.exit()
 
@@ -70,9 +76,37 @@ class Alignment(DiGraph):
         # path_edges() calculates distance to an assumed single outlet for all vertices
 
 
+    def _distances_to(self, outlet: int, weight: str = 'len') -> dict:
+        """Return the cost path distance from every node to a given node
+
+        Distances for all nodes are computed in a single reverse Dijkstra
+        traversal and cached, avoiding a shortest-path search per edge.
+
+        Parameters:
+            outlet: network outlet node ID
+
+        Other Parameters:
+            weight: name of property to use for weight calculation
+
+        Returns:
+            mapping of node ID to cost path distance from the outlet
+
+        """
+        if not hasattr(self, '_addresses_cache'):
+            self._addresses_cache = {}
+        key = (outlet, weight)
+        if key not in self._addresses_cache:
+            reverse_view = self.reverse(copy=False)
+            self._addresses_cache[key] = nx.single_source_dijkstra_path_length(
+                reverse_view, outlet, weight=weight)
+        return self._addresses_cache[key]
+
     def get_vertices(self):
         """Get a dataframe of the vertices
 
+        The table is built once and cached for reuse by the despike, slope,
+        and projection helpers; treat the returned frame as read-only.
+
         Returns:
             vertices (pandas.DataFrame): point information
 
@@ -85,42 +119,129 @@ class Alignment(DiGraph):
             path_m  distance from the edge end endpoint (as `float`)
             ======  ====================================================
         """
+        if getattr(self, '_vertices_cache', None) is not None:
+            return self._vertices_cache
 
-        # make sure we're not calling this repeatedly
-        # curframe = inspect.currentframe()
-        # calframe = inspect.getouterframes(curframe, 2)
-        # print('caller name:', calframe[1][3])
+        distances = self._distances_to(self.outlet())
 
-        result = pnd.DataFrame()
+        # gather every edge's vertices, then assemble each column in a single
+        # allocation instead of concatenating per-edge frames; the cached
+        # coords and meas arrays avoid a GEOS projection per vertex
+        edges = []
+        blocks = []
         for from_node, to_node, data in self.edges(data=True):
-            path = self.path_edges(from_node, self.outlet())
-            path_len = self.path_weight(path, 'len')
+            edges.append((from_node, to_node))
+            if 'coords' in data and 'meas' in data:
+                coords = data['coords']
+                if coords.shape[1] < 3:
+                    z = np.full(len(coords), np.nan)
+                else:
+                    z = coords[:, 2]
+                blocks.append(np.column_stack((data['meas'], coords[:, :2], z)))
+            else:
+                blocks.append(np.asarray(linestring_to_vertices(data['geom']), dtype=float))
+
+        counts = [len(block) for block in blocks]
+        stacked = np.concatenate(blocks)
+        m = stacked[:, 0]
+        path_len = np.repeat([distances[from_node] for from_node, _ in edges], counts)
+
+        # categorical edge keys group and filter on int codes rather than
+        # hashing node tuples per row; float32 m and z halve the bytes moved
+        # by the window scans downstream
+        codes = np.repeat(np.arange(len(edges)), counts)
+        edge_col = pnd.Categorical.from_codes(
+            codes, dtype=pnd.CategoricalDtype(pnd.Index(edges, tupleize_cols=False)))
+        result = pnd.DataFrame({'m': m.astype(np.float32),
+                                'x': stacked[:, 1],
+                                'y': stacked[:, 2],
+                                'z': stacked[:, 3].astype(np.float32),
+                                'edge': edge_col,
+                                'path_m': path_len - m})
+
+        self._vertices_cache = result
+        return result
 
-            line_vertices = pnd.DataFrame(linestring_to_vertices(data['geom']),
-                                          columns=['m', 'x', 'y', 'z'])
-            line_vertices['edge'] = [(from_node, to_node)] * len(line_vertices)
-            line_vertices['path_m'] = path_len - line_vertices['m']
 
-            if result.empty:
-                result = line_vertices
-            else:
-                result = pnd.concat([result, line_vertices], ignore_index=True)
+    def edge_groups(self, vertices: Optional[pnd.DataFrame] = None) -> dict:
+        """Return positional row indices for each edge of a vertex table
 
-        return result
+        The index for the cached vertex table is built once and reused, so
+        the despike-slope-identify pipeline does not refactorize the edge
+        column on every call.
+
+        Other Parameters:
+            vertices: vertex table to index; the cached table by default
+
+        Returns:
+            mapping of edge tuple to positional row indices
+
+        """
+        if vertices is None:
+            vertices = self.get_vertices()
+        cached = getattr(self, '_edge_groups_cache', None)
+        if cached is None or cached[0] is not vertices:
+            cached = (vertices, vertices.groupby('edge', sort=False).indices)
+            self._edge_groups_cache = cached
+        return cached[1]
+
+    def edge_tail_stat(
+        self,
+        edge: tuple[int, int],
+        window: Optional[int] = None,
+        column: str = 'z',
+        statistic: str = 'min',
+        vertices: Optional[pnd.DataFrame] = None
+    ) -> float:
+        """Return a statistic over the tail window of an edge's vertices
+
+        Results are memoized per (edge, window, column, statistic) against
+        the vertex table they came from, so repeated neighbor tests during
+        graph traversal become dict lookups instead of column reductions.
+
+        Parameters:
+            edge: tuple identifying the edge
+
+        Other Parameters:
+            window: number of tail vertices to test; all vertices by default
+            column: column to reduce
+            statistic: test statistic (not implemented, only minimum used)
+            vertices: vertex table to read; the cached table by default
+
+        Returns:
+            statistic value over the window
 
+        """
+        if vertices is None:
+            vertices = self.get_vertices()
+        cached = getattr(self, '_edge_stat_cache', None)
+        if cached is None or cached[0] is not vertices:
+            cached = (vertices, {})
+            self._edge_stat_cache = cached
+        stats = cached[1]
+        key = (edge, window, column, statistic)
+        if key not in stats:
+            idx = self.edge_groups(vertices)[edge]
+            if window:
+                idx = idx[-window:]
+            stats[key] = vertices[column].take(idx).min()
+        return stats[key]
 
     def outlet(self) -> int:
         """Return the root node in a directed graph
 
         In a stream network this represents the drainage outlet.
+        The node is found once and cached; the graph is not expected to be
+        mutated after construction.
 
         Returns:
             outlet node ID
 
         """
-        for node in self.nodes():
-            if self.out_degree(node) == 0:
-                return node
+        if getattr(self, '_outlet', None) is None:
+            self._outlet = next(
+                (node for node, degree in self.out_degree() if degree == 0), None)
+        return self._outlet
 
     def edge_addresses(self, outlet: int, weight: str = 'len') -> pnd.DataFrame:
         """Calculate cost path distances from a given node to each graph edge end node
@@ -140,16 +261,15 @@ class Alignment(DiGraph):
             to_node_address    cost path distance between outlet node and edge end node (as `float`)
             =================  =======================================================================
         """
-        addresses = []
-        for from_node, to_node, _ in self.edges(data=True):
-            to_node_path = self.path_edges(to_node, outlet)
-            to_node_dist = self.path_weight(to_node_path, weight)
-
-            from_node_path = self.path_edges(from_node, outlet)
-            from_node_dist = self.path_weight(from_node_path, weight)
-
-            addresses.append([(from_node, to_node), from_node_dist, to_node_dist])
-        result = pnd.DataFrame(addresses, columns=['edge', 'from_node_address', 'to_node_address'])
+        distances = self._distances_to(outlet, weight)
+        edges = list(self.edges())
+        from_node_address = np.fromiter(
+            (distances[from_node] for from_node, _ in edges), dtype=float, count=len(edges))
+        to_node_address = np.fromiter(
+            (distances[to_node] for _, to_node in edges), dtype=float, count=len(edges))
+        result = pnd.DataFrame({'edge': edges,
+                                'from_node_address': from_node_address,
+                                'to_node_address': to_node_address})
 
         return result
 
@@ -176,13 +296,25 @@ class Alignment(DiGraph):
         """
         if edges is None:
             edges = self.edges()
-        geoms = [self[from_node][to_node]['geom'] for (from_node, to_node) in edges]
-        polygon = MultiLineString(geoms).buffer(radius)
+        edges = tuple(edges)
+
+        # buffering is one of the costlier GEOS calls here and the same
+        # radius and edge set recur across plot and projection passes
+        if not hasattr(self, '_edge_buffer_cache'):
+            self._edge_buffer_cache = {}
+        key = (radius, edges)
+        if key not in self._edge_buffer_cache:
+            geoms = [self[from_node][to_node]['geom'] for (from_node, to_node) in edges]
+            if len(geoms) == 1:
+                # no point wrapping a single line in a collection
+                self._edge_buffer_cache[key] = geoms[0].buffer(radius)
+            else:
+                self._edge_buffer_cache[key] = MultiLineString(geoms).buffer(radius)
 
         # bufs = [geom.buffer(radius) for geom in new_geoms]
         # polygon = unary_union(bufs)
 
-        return polygon
+        return self._edge_buffer_cache[key]
 
     def path_edges(
         self,
@@ -192,6 +324,9 @@ class Alignment(DiGraph):
     ) -> Iterable[tuple[int, int]]:
         """Return the set of graph edges making up a shortest path
 
+        Paths are cached per (start, goal, weight), and the result is a
+        tuple rather than a one-shot iterator so callers can reuse it.
+
         Parameters:
             start: starting node ID
             goal: goal node ID
@@ -203,10 +338,41 @@ class Alignment(DiGraph):
             edges making up the path
 
         """
-        path = nx.shortest_path(self, start, goal, weight=weight)
-        edges = zip(path[:-1], path[1:])
+        if not hasattr(self, '_path_edges_cache'):
+            self._path_edges_cache = {}
+        key = (start, goal, weight)
+        if key not in self._path_edges_cache:
+            # on a drainage tree the downstream path is unique, so walking
+            # successors beats a shortest-path search; braided reaches fall
+            # back to networkx
+            node = start
+            path = [start]
+            while node != goal and self.out_degree(node) == 1:
+                node = next(self.successors(node))
+                path.append(node)
+            if node != goal:
+                path = nx.shortest_path(self, start, goal, weight=weight)
+            self._path_edges_cache[key] = tuple(zip(path[:-1], path[1:]))
+        return self._path_edges_cache[key]
+
+    def path_length_to_outlet(self, node: int, weight: str = 'len') -> float:
+        """Return the total cost path distance from a node to the outlet
+
+        Prefer this over summing path_edges() output when only the total is
+        needed; it reads from the cached node-to-outlet distance map rather
+        than materializing the path.
+
+        Parameters:
+            node: starting node ID
+
+        Other Parameters:
+            weight: name of property to use for weight calculation
+
+        Returns:
+            total path weight between the node and the outlet
 
-        return edges
+        """
+        return self._distances_to(self.outlet(), weight)[node]
 
     def path_weight(self, edges: Iterable[tuple[int, int]], weight: str) -> float:
         """Return the path weight of a set of graph edges
@@ -243,25 +409,37 @@ class Alignment(DiGraph):
             ======  ====================================================
         """
         edge_addresses = self.edge_addresses(self.outlet())
-        stations = pnd.DataFrame()
+        address_map = edge_addresses.set_index('edge')['to_node_address'].to_dict()
+        distances = self._distances_to(self.outlet())
+
+        # stack per-edge station blocks and assemble each column once, the
+        # same scheme get_vertices uses
+        edges = []
+        blocks = []
         for from_node, to_node, data in self.edges(data=True):
-            path = self.path_edges(from_node, self.outlet())
-            path_len = self.path_weight(path, 'len')
             line = data['geom']
+            start = (address_map[(from_node, to_node)] + data['len']) % step
+            block = np.asarray(linestring_to_stations(line, position=start, step=step),
+                               dtype=float).reshape(-1, 4)
+            edges.append((from_node, to_node))
+            blocks.append(block)
+
+        counts = [len(block) for block in blocks]
+        stacked = np.concatenate(blocks)
+        m = stacked[:, 0]
+        path_len = np.repeat([distances[from_node] for from_node, _ in edges], counts)
+
+        codes = np.repeat(np.arange(len(edges)), counts)
+        edge_col = pnd.Categorical.from_codes(
+            codes, dtype=pnd.CategoricalDtype(pnd.Index(edges, tupleize_cols=False)))
+        result = pnd.DataFrame({'m': m.astype(np.float32),
+                                'x': stacked[:, 1],
+                                'y': stacked[:, 2],
+                                'z': stacked[:, 3].astype(np.float32),
+                                'edge': edge_col,
+                                'path_m': path_len - m})
 
-            end_address = edge_addresses[edge_addresses['edge'] == (from_node, to_node)]
-            start = (end_address.iloc[0]['to_node_address'] + line.length) % step
-
-            line_stations = pnd.DataFrame(linestring_to_stations(line, position=start, step=step), columns=['m', 'x', 'y', 'z'])
-            line_stations['edge'] = [(from_node, to_node) for _ in range(line_stations.shape[0])]
-            line_stations['path_m'] = path_len - line_stations['m']
-
-            if stations.empty:
-                stations = line_stations
-            else:
-                stations = pnd.concat([stations, line_stations], ignore_index=True)
-
-        return stations
+        return result
 
     def intermediate_nodes(self) -> list[int]:
         """Return the set of nodes intermediate between leaf and root nodes
@@ -270,8 +448,9 @@ class Alignment(DiGraph):
             list of all intermediate node ID values
 
         """
-        node_list = [node for node in self.nodes()
-                     if self.out_degree(node) > 0 and self.in_degree(node) > 0]
+        in_degrees = dict(self.in_degree())
+        node_list = [node for node, degree in self.out_degree()
+                     if degree > 0 and in_degrees[node] > 0]
         return node_list
 
 
@@ -317,14 +496,38 @@ def remove_spikes(
         edges = subgraph.edges()
     else:
         edges = graph.edges()
+    edges = list(edges)
+    if not edges:
+        # an empty selection, e.g. goal at a leaf node with no ancestors
+        result = vertices.iloc[0:0].copy()
+        result['zmin'] = np.array([], dtype=float)
+        return result
 
-    result = pnd.DataFrame()
-    for edge in edges:
-        edge_data = extend_edge(graph, edge, vertices=vertices, window=40)
-        edge_data['zmin'] = edge_data[column].expanding().min()
-        clip = edge_data[edge_data['edge'] == edge]
+    window = 40
+    groups = graph.edge_groups(vertices)
+    order = np.concatenate([groups[edge] for edge in edges])
+    result = vertices.take(order)
 
-        result = pnd.concat([result, clip])
+    # an expanding minimum over an edge extended with an upstream window is
+    # the edgewise cumulative minimum clamped by the window minimum, so the
+    # per-edge extend-and-clip loop reduces to one grouped cummin plus a
+    # scalar seed per edge
+    seeds = np.full(len(edges), np.nan)
+    for i, edge in enumerate(edges):
+        pre_edge = get_neighbor_edge(graph, edge, vertices=vertices, column='z',
+                                     direction='up', window=window, statistic='min')
+        if pre_edge is not None:
+            seeds[i] = vertices.take(groups[pre_edge][-window:])[column].min()
+
+    # cumulative minimum reset at each edge block, straight on the float
+    # array; fmin skips NaN the way pandas cummin does
+    values = result[column].to_numpy(dtype=float, copy=False)
+    bounds = np.cumsum([0] + [len(groups[edge]) for edge in edges])
+    cummin = np.empty(len(values))
+    for block_start, block_stop in zip(bounds[:-1], bounds[1:]):
+        np.fmin.accumulate(values[block_start:block_stop],
+                           out=cummin[block_start:block_stop])
+    result['zmin'] = np.fmin(cummin, np.repeat(seeds, np.diff(bounds)))
 
     return result
 
@@ -349,30 +552,35 @@ def roll_down(
         vertices = graph.get_vertices()
 
     edges = list(graph.path_edges(start, goal))
-    for i, edge in enumerate(edges):
-        pre_window = pnd.DataFrame()
-        post_window = pnd.DataFrame()
+    groups = graph.edge_groups(vertices)
 
-        verts = vertices[vertices['edge'] == edge]
+    # stack every extended edge once, tagged with the edge it serves, so a
+    # single sort and one grouped rolling pass replace the per-edge loop
+    pieces = []
+    for i, edge in enumerate(edges):
+        parts = [vertices.take(groups[edge])]
         if i > 0:
-            pre_edge = get_neighbor_edge(graph, edge, direction='up', column='z', statistic='min')
-            pre_window = vertices[vertices['edge'] == pre_edge].tail(window)
+            pre_edge = get_neighbor_edge(graph, edge, vertices=vertices,
+                                         direction='up', column='z', statistic='min')
+            if pre_edge is not None:
+                parts.insert(0, vertices.take(groups[pre_edge][-window:]))
         if i <= len(edges)-2:
-            post_window = vertices[vertices['edge'] == edges[i+1]].head(window)
+            parts.append(vertices.take(groups[edges[i+1]][:window]))
 
-        if pre_window.empty is False and post_window.empty is False:
-            extended = pnd.concat([pre_window, verts, post_window])
-        elif pre_window.empty is False:
-            extended = pnd.concat([pre_window, verts])
-        else:
-            extended = pnd.concat([verts, post_window])
-        roll = extended.sort_values(by='path_m')
+        piece = pnd.concat(parts)
+        piece['target_edge'] = [edge] * len(piece)
+        pieces.append(piece)
 
-        roll['roll'] = roll['z'].rolling(window=window, win_type='triang', center=True).mean()
+    stacked = pnd.concat(pieces).sort_values(by=['target_edge', 'path_m'], kind='stable')
+    stacked['roll'] = stacked.groupby('target_edge', sort=False, group_keys=False)['z'].apply(
+        lambda x: x.rolling(window=window, win_type='triang', center=True).mean())
 
-        result = roll[roll['edge'] == edge]
+    stacked_groups = stacked.groupby('target_edge', sort=False).indices
+    for edge in edges:
+        rows = stacked.take(stacked_groups[edge])
+        result = rows[rows['edge'] == edge]
 
-        print(result)
+        print(result.drop(columns='target_edge'))
 
 
 def slope(
@@ -405,14 +613,49 @@ def slope(
     if vertices is None:
         vertices = graph.get_vertices()
 
-    result = pnd.DataFrame()
-    for edge in graph.edges():
-        edge_data = extend_edge(graph, edge, vertices=vertices, window=10)
-        # here, rise and slope are treated in the mathematical sense and will be negative for a stream
-        edge_data['rise'] = edge_data[column] - edge_data[column].shift(-1)
-        edge_data['slope'] = edge_data['rise'] / (edge_data['path_m'].shift(-1) - edge_data['path_m'])
-        clip = edge_data[edge_data['edge'] == edge]
+    edges = list(graph.edges())
+    if not edges:
+        result = vertices.iloc[0:0].copy()
+        result['rise'] = np.array([], dtype=float)
+        result['slope'] = np.array([], dtype=float)
+        return result
 
-        result = pnd.concat([result, clip])
+    window = 10
+    groups = graph.edge_groups(vertices)
+    order = np.concatenate([groups[edge] for edge in edges])
+    result = vertices.take(order)
+
+    # rows sit in contiguous per-edge blocks, so the next vertex on the same
+    # edge is simply the next row; one fused pass over the raw arrays emits
+    # rise and slope together without intermediate Series
+    values = result[column].to_numpy(dtype=float, copy=False)
+    path_m = result['path_m'].to_numpy(dtype=float, copy=False)
+    bounds = np.cumsum([0] + [len(groups[edge]) for edge in edges])
+
+    next_vals = np.full(len(values), np.nan)
+    next_path = np.full(len(values), np.nan)
+    next_vals[:-1] = values[1:]
+    next_path[:-1] = path_m[1:]
+
+    # the last vertex of each edge takes its forward difference from the
+    # first vertex of the downstream window extend_edge would have appended
+    last_rows = bounds[1:] - 1
+    next_vals[last_rows] = np.nan
+    next_path[last_rows] = np.nan
+    all_values = vertices[column].to_numpy(dtype=float, copy=False)
+    all_path = vertices['path_m'].to_numpy(dtype=float, copy=False)
+    for i, edge in enumerate(edges):
+        post_edge = get_neighbor_edge(graph, edge, vertices=vertices, column='z',
+                                      direction='down', window=window, statistic='min')
+        if post_edge is not None:
+            first_pos = groups[post_edge][0]
+            next_vals[last_rows[i]] = all_values[first_pos]
+            next_path[last_rows[i]] = all_path[first_pos]
+
+    # here, rise and slope are treated in the mathematical sense and will be negative for a stream
+    # edge-boundary rows divide NaN by NaN, which is the intended NaN result
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['rise'] = values - next_vals
+        result['slope'] = (values - next_vals) / (next_path - path_m)
 
     return result
@@ -1,7 +1,13 @@
 
+import numpy as np
 import pandas as pnd
 import networkx as nx
 
+# normalized 9-point triangular kernel, precomputed once; equivalent to
+# rolling(window=9, win_type='triang').mean()
+TRIANG_KERNEL = np.array([1, 2, 3, 4, 5, 4, 3, 2, 1], dtype=np.float64)
+TRIANG_KERNEL /= TRIANG_KERNEL.sum()
+
 
 def remove_spikes_edgewise(vertices: pnd.DataFrame) -> pnd.DataFrame:
     """Remove spikes by calculating an expanding minimum from upstream to downstream
@@ -16,7 +22,7 @@ def remove_spikes_edgewise(vertices: pnd.DataFrame) -> pnd.DataFrame:
 
     """
     grouped = vertices.groupby('edge')
-    zmin = grouped['z'].apply(lambda x: x.expanding().min())
+    zmin = grouped['z'].cummin()
     zmin.name = 'zmin'
 
     result = pnd.concat([vertices, zmin], axis=1)
@@ -33,11 +39,18 @@ def rolling_mean_edgewise(points: pnd.DataFrame) -> pnd.DataFrame:
     Returns:
         pandas.DataFrame of coordinate addresses added column 'zmean'
     """
-    grouped = points.groupby('edge')
-    means = grouped['z'].apply(lambda x: x.rolling(window=9, win_type='triang', center=True).mean())
-    means.name = 'zmean'
+    window = len(TRIANG_KERNEL)
+    half = window // 2
+
+    z = points['z'].to_numpy(dtype=float, copy=False)
+    means = np.full(len(points), np.nan)
+    for positions in points.groupby('edge').indices.values():
+        if len(positions) >= window:
+            # centered weighted mean as one convolution; the half-window rows
+            # at each end stay NaN as with the pandas rolling window
+            means[positions[half:-half]] = np.convolve(z[positions], TRIANG_KERNEL, mode='valid')
 
-    result = pnd.concat([points, means], axis=1)
+    result = pnd.concat([points, pnd.Series(means, index=points.index, name='zmean')], axis=1)
 
     return result
 
@@ -57,16 +70,37 @@ def difference(
         column2: second series column
 
     Returns:
-        pandas.DataFrame with added column 'diff' containing the difference
+        pandas.DataFrame with both series interpolated onto the union of
+        their station positions along each edge, and a column 'diff'
+        containing the difference
 
     """
-    combined = pnd.concat([series1, series2], axis=0, ignore_index=True)
-    grouped = combined.groupby('edge')
-    for edge, group in grouped:
-        aligned = group.sort_values(by='m')
-        aligned_m = aligned.set_index('m')
-        filled_series = aligned_m.interpolate(method='values')
-        filled_series['diff'] = filled_series[column1] - filled_series[column2]
-
-    # have to build up the dataframe...
-    return pnd.DataFrame()
+    groups1 = series1.groupby('edge', sort=False).indices
+    groups2 = series2.groupby('edge', sort=False).indices
+
+    m1 = series1['m'].to_numpy(dtype=float, copy=False)
+    v1 = series1[column1].to_numpy(dtype=float, copy=False)
+    m2 = series2['m'].to_numpy(dtype=float, copy=False)
+    v2 = series2[column2].to_numpy(dtype=float, copy=False)
+
+    chunks = []
+    for edge, positions1 in groups1.items():
+        if edge not in groups2:
+            continue
+        positions2 = groups2[edge]
+
+        order1 = positions1[np.argsort(m1[positions1])]
+        order2 = positions2[np.argsort(m2[positions2])]
+        stations = np.union1d(m1[order1], m2[order2])
+
+        filled1 = np.interp(stations, m1[order1], v1[order1])
+        filled2 = np.interp(stations, m2[order2], v2[order2])
+
+        chunk = pnd.DataFrame({'m': stations, column1: filled1, column2: filled2,
+                               'diff': filled1 - filled2})
+        chunk['edge'] = [edge] * len(chunk)
+        chunks.append(chunk)
+
+    if not chunks:
+        return pnd.DataFrame(columns=['m', column1, column2, 'diff', 'edge'])
+    return pnd.concat(chunks, ignore_index=True)
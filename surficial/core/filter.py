@@ -4,6 +4,33 @@ import numpy as np
 import pandas as pnd
 
 
+def _steep_series(slope: np.ndarray, min_slope: float, lag: bool = False) -> tuple:
+    """Label contiguous runs of slope steeper or gentler than a threshold
+
+    A run boundary is opened wherever the slope rises above the threshold,
+    so the series id is simply a cumulative count of the steep indicator.
+
+    Parameters:
+        slope: slope values as rise/run
+        min_slope: threshold slope
+        lag: shift the indicator so each row is grouped by the slope of the
+            preceding segment
+
+    Returns:
+        int8 steep indicator and int32 series id arrays
+
+    """
+    # ~(slope <= min_slope) counts NaN slopes as steep, matching the old
+    # np.where(slope <= min_slope, 0, 1); the NaN rows at edge ends then
+    # keep breaking runs between unrelated edges
+    is_steep = (~(slope <= min_slope)).astype(np.int8)
+    if lag:
+        series = np.concatenate(([0], np.cumsum(is_steep[:-1]))).astype(np.int32)
+    else:
+        series = np.cumsum(is_steep, dtype=np.int32)
+    return is_steep, series
+
+
 def knickpoint(
     vertices: pnd.DataFrame,
     min_slope: Union[int, float],
@@ -38,19 +65,32 @@ def knickpoint(
         drop         max accumulated drop above `min_drop` over a slope steeper than `min_slope` (as `float`)
         ===========  ========================================================
     """
-    vertices['is_steep'] = np.where(vertices['slope'] <= min_slope, 0, 1)
     # okay as long as slope doesn't terminate at an endpoint - need to expand
-    vertices['is_steep'] = vertices['is_steep'].shift(1)
-    vertices['series'] = vertices['is_steep'].cumsum()
+    is_steep, series = _steep_series(vertices['slope'].to_numpy(), min_slope, lag=True)
+    vertices['is_steep'] = is_steep
+    vertices['series'] = series
+
+    if len(series) < 2:
+        # nothing left to group once row 0 is excluded
+        candidates = vertices.iloc[0:0].set_index('series')
+        candidates['drop'] = np.array([], dtype=float)
+        return candidates
+
+    # series is a monotonic cumsum, so group boundaries fall where it steps;
+    # row 0 has no preceding segment and stays out of the grouping, just as
+    # the shift(1) NaN kept it out of the groupby
+    series_id = series[1:]
+    bounds = np.concatenate(([1], np.flatnonzero(np.diff(series_id)) + 2, [len(series)]))
+    up_idx = bounds[:-1]
+    down_idx = bounds[1:] - 1
 
-    ups = vertices.groupby('series').first()
-    downs = vertices.groupby('series').last()
-    drops = ups['zmin'] - downs['zmin']
-    drops.name = 'drop'
+    zmin = vertices['zmin'].to_numpy()
+    drops = zmin[up_idx] - zmin[down_idx]
     if up is True:
-        candidates = pnd.concat([ups, drops], axis=1)
+        candidates = vertices.iloc[up_idx].set_index('series')
     else:
-        candidates = pnd.concat([downs, drops], axis=1)
+        candidates = vertices.iloc[down_idx].set_index('series')
+    candidates['drop'] = drops
     result = candidates[candidates['drop'] >= min_drop]
 
     return result
@@ -91,19 +131,22 @@ def knickpoint_alt(
         drop         max accumulated drop above `min_drop` over a slope steeper than `min_slope` (as `float`)
         ===========  ========================================================
     """
-    vertices['is_steep'] = np.where(vertices['slope'] <= min_slope, 0, 1)
-    vertices['series'] = vertices['is_steep'].cumsum()
-    print(pnd.unique(vertices['series']))
+    is_steep, series = _steep_series(vertices['slope'].to_numpy(), min_slope)
+    vertices['is_steep'] = is_steep
+    vertices['series'] = series
+    # one grouper serves both the accumulation and the winner selection
+    grouped = vertices.groupby('series', sort=False)
     if up is True:
-        vertices['drop'] = vertices.sort_values(by='path_m', ascending=True).groupby(['series'])['rise'].cumsum()
-        idx_0 = vertices.groupby(['series'])['drop'].transform(max) == vertices['drop']
-        hits_0 = vertices[idx_0]
-        idx_1 = hits_0.groupby(['series'])['path_m'].transform(max) == hits_0['path_m']
-        hits = hits_0[idx_1].drop(['is_steep', 'series'], axis=1)
+        vertices['drop'] = vertices.sort_values(by='path_m', ascending=True).groupby('series', sort=False)['rise'].cumsum()
     else:
-        vertices['drop'] = vertices.groupby(['series'])['rise'].cumsum()
-        idx = vertices.groupby(['series'])['drop'].transform(max) == vertices['drop']
-        hits = vertices[idx].drop(['is_steep', 'series'], axis=1)
+        vertices['drop'] = grouped['rise'].cumsum()
+    # idxmax picks the winning row per series directly; on ties it keeps the
+    # first row in vertex order, which is the upstream-most (greatest path_m).
+    # groups whose drop is all NaN yield no hit, as the old transform('max')
+    # comparison did, so leave them out before reducing
+    valid = vertices.dropna(subset=['drop'])
+    hits_idx = valid.groupby('series', sort=False)['drop'].idxmax()
+    hits = vertices.loc[hits_idx].drop(['is_steep', 'series'], axis=1)
     result = hits[hits['drop'] >= min_drop]
 
     return result
@@ -1,35 +1,79 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from operator import itemgetter
-from typing import Union
+from typing import Iterable, Union
 
+import numpy as np
 import pandas as pnd
+import shapely
 from shapely.geometry import Point
 
 import surficial as srf
-from surficial.ops.shape import filter_contains, project2d
 
 
 def address_to_point(
     graph: srf.Alignment,
     edge: tuple[int, int],
-    m: float
+    m: Union[float, Iterable[float]]
 ) -> Point:
     """Return a Point location given an edge address within an Alignment
 
     Parameters:
         graph: directed network graph
         edge: tuple identifying the edge
-        m: distance measure along the edge geometry
+        m: distance measure, or array of measures, along the edge geometry
 
     Returns:
-        point address location
+        point address location, or an array of locations for an array of
+        measures
 
     """
-    line = graph[edge[0]][edge[1]]['geom']
-    point = line.interpolate(m)
+    data = graph[edge[0]][edge[1]]
+    if not np.isscalar(m):
+        # batch addresses interpolate in one GEOS call
+        return shapely.line_interpolate_point(data['geom'], np.asarray(m, dtype=float))
+    meas = data.get('meas')
+    coords = data.get('coords')
+    if meas is None or coords is None or not 0 <= m <= data['len']:
+        # no cached arrays, or a measure outside the line; let GEOS decide
+        return data['geom'].interpolate(m)
+
+    i = np.searchsorted(meas, m)
+    if i == 0:
+        return Point(coords[0])
+    if i == len(meas):
+        # GEOS length can differ from the measured length by an ulp
+        return Point(coords[-1])
+    run = meas[i] - meas[i - 1]
+    if run == 0:
+        return Point(coords[i])
+    t = (m - meas[i - 1]) / run
+    return Point(coords[i - 1] + t * (coords[i] - coords[i - 1]))
+
+
+def addresses_to_points(
+    graph: srf.Alignment,
+    edges: Iterable[tuple[int, int]],
+    ms: Iterable[float]
+) -> np.ndarray:
+    """Return Point locations for pairs of edge and distance measure
+
+    All addresses interpolate in one vectorized call; pass the same edge
+    several times to locate several measures along it.
 
-    return point
+    Parameters:
+        graph: directed network graph
+        edges: tuple identifying the edge for each measure
+        ms: distance measure along each edge geometry
+
+    Returns:
+        array of point address locations
+
+    """
+    lines = np.array([graph[from_node][to_node]['geom']
+                      for from_node, to_node in edges], dtype=object)
+    return shapely.line_interpolate_point(lines, np.asarray(ms, dtype=float))
 
 
 def points_to_addresses(
@@ -68,24 +112,77 @@ def points_to_addresses(
     if edges is None:
         edges = graph.edges()
 
-    rows = []
-    for edge in edges:
-        edge_rows = []
-        buf = graph.edge_buffer(radius, edges=[edge])
-        fids, pts = filter_contains(points, buf)
-
-        geom = graph[edge[0]][edge[1]]['geom']
-        meas = graph[edge[0]][edge[1]]['meas']
-        for fid, p in zip(fids,pts):
-            pp = project2d(p, geom, measure=meas)
-            if reverse is True:
-                m = geom.length - pp['m']
-            else:
-                m = pp['m']
-            if m > 0 and m < geom.length:
-                edge_rows.append([fid, m, pp['pt'].x, pp['pt'].y, pp['pt'].z, pp['d'], edge])
-        rows.extend(sorted(edge_rows, key=itemgetter(0), reverse=False))
-    result = pnd.DataFrame(rows, columns=['fid', 'm', 'x', 'y', 'z', 'd', 'edge'])
+    all_fids, all_pts = zip(*points) if points else ((), ())
+    all_fids = np.asarray(all_fids, dtype=object)
+    all_pts = np.asarray(all_pts, dtype=object)
+    # one spatial index over the points replaces a buffer-and-contains
+    # test per edge
+    tree = shapely.STRtree(all_pts)
+
+    def project_edge(edge: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        data = graph[edge[0]][edge[1]]
+        geom = data['geom']
+        # line_locate_point clamps to the GEOS length, which differs from
+        # the cached planar measure by ulps; filtering on the same metric
+        # keeps end-of-edge projections out, as the old per-point loop did
+        length = geom.length
+        candidates = np.sort(tree.query(geom, predicate='dwithin', distance=radius))
+        fids = all_fids[candidates]
+        pts = all_pts[candidates]
+
+        meas = data['meas']
+        coords = data['coords'][:, :2]
+
+        pts_arr = np.asarray(pts, dtype=object)
+        xyz = shapely.get_coordinates(pts_arr, include_z=True)
+        m = shapely.line_locate_point(geom, pts_arr)
+        proj = shapely.get_coordinates(shapely.line_interpolate_point(geom, m))
+
+        # signed offset; negative is left of the segment holding the projection
+        seg = np.searchsorted(meas, m, side='left')
+        # points locating to an edge end give m == geom.length, which can
+        # exceed the planar measure by an ulp; clamp to the last segment
+        np.clip(seg, 1, len(meas) - 1, out=seg)
+        from_vert = coords[seg]
+        to_vert = coords[seg - 1]
+        orientation = (xyz[:, 1] - from_vert[:, 1]) * (to_vert[:, 0] - from_vert[:, 0]) - \
+                      (xyz[:, 0] - from_vert[:, 0]) * (to_vert[:, 1] - from_vert[:, 1])
+        offset = np.hypot(proj[:, 0] - xyz[:, 0], proj[:, 1] - xyz[:, 1])
+        offset[orientation < 0] *= -1
+
+        if reverse is True:
+            m = length - m
+        keep = (m > 0) & (m < length)
+        order = np.flatnonzero(keep)
+        fid_arr = np.asarray(fids, dtype=object)
+        order = order[np.argsort(fid_arr[order], kind='stable')]
+
+        return fid_arr[order], np.column_stack((m[order], proj[order], xyz[order, 2], offset[order]))
+
+    # the per-edge work is GEOS calls and numpy reductions, all of which
+    # release the GIL; map preserves edge order so results are deterministic
+    edge_list = list(edges)
+    with ThreadPoolExecutor() as executor:
+        projected = list(executor.map(project_edge, edge_list))
+
+    fid_chunks = [fids for fids, _ in projected]
+    num_chunks = [block for _, block in projected]
+    counts = [len(block) for block in num_chunks]
+
+    numeric = np.concatenate(num_chunks) if num_chunks else np.empty((0, 5))
+    # categorical edge keys compare and join on int codes, as in get_vertices
+    codes = np.repeat(np.arange(len(edge_list)), counts)
+    edge_col = pnd.Categorical.from_codes(
+        codes, dtype=pnd.CategoricalDtype(pnd.Index(edge_list, tupleize_cols=False)))
+    result = pnd.DataFrame({
+        'fid': np.concatenate(fid_chunks) if fid_chunks else [],
+        'm': numeric[:, 0],
+        'x': numeric[:, 1],
+        'y': numeric[:, 2],
+        'z': numeric[:, 3],
+        'd': numeric[:, 4],
+        'edge': edge_col,
+    })
 
     return result
 
@@ -113,7 +210,8 @@ def get_path_distances(
         :to_node_address (float): cost path distance from the edge end node to the outlet node
         :path_m (float): path distance from the point to the outlet node
     """
-    addresses = pnd.merge(point_addresses, edge_addresses, on='edge')
+    addresses = pnd.merge(point_addresses, edge_addresses, how='inner', on='edge',
+                          sort=False, validate='many_to_one')
     addresses['path_m'] = addresses['from_node_address'] - addresses['m']
 
     return addresses
@@ -139,17 +237,14 @@ def get_pre_window(
         modified vertices
 
     """
-    in_window = pnd.DataFrame()
-    val = None
-    for edge in edges:
-        tmp = vertices[vertices['edge'] == edge].tail(window)
-        if val:
-            if tmp[column].min() < val:
-                in_window = tmp
-        else:
-            in_window = tmp
-            val = tmp[column].min()
-    return in_window
+    if not edges:
+        return pnd.DataFrame()
+
+    groups = vertices.groupby('edge', sort=False).indices
+    stats = [(edge, vertices[column].take(groups[edge][-window:]).min())
+             for edge in edges]
+    winner, _ = min(stats, key=itemgetter(1))
+    return vertices.iloc[groups[winner][-window:]]
 
 
 def get_neighbor_edge(
@@ -180,32 +275,19 @@ def get_neighbor_edge(
     if vertices is None:
         vertices = graph.get_vertices()
 
-    result = None
-    val = None
-
     if direction == 'up':
         neighbors = [(i, edge[0]) for i in graph.predecessors(edge[0])]
     else:
         neighbors = [(edge[1], i) for i in graph.successors(edge[1])]
 
-    if len(neighbors) > 0:
-        for neighbor in neighbors:
-            if window:
-                test_verts = vertices[vertices['edge'] == neighbor].tail(window)
-            else:
-                test_verts = vertices[vertices['edge'] == neighbor]
-
-            if statistic == 'min':
-                test_val = test_verts[column].min()
-                if val:
-                    if test_val < val:
-                        result = neighbor
-                        val = test_val
-                else:
-                    result = neighbor
-                    val = test_val
+    if not neighbors or statistic != 'min':
+        return None
 
-    return result
+    # min keeps the first neighbor on ties or NaN, as the old loop did
+    vals = [(neighbor, graph.edge_tail_stat(neighbor, window=window, column=column,
+                                            statistic=statistic, vertices=vertices))
+            for neighbor in neighbors]
+    return min(vals, key=itemgetter(1))[0]
 
 
 def extend_edge(
@@ -232,7 +314,8 @@ def extend_edge(
     if vertices is None:
         vertices = graph.get_vertices()
 
-    edge_vertices = vertices[vertices['edge'] == edge]
+    groups = graph.edge_groups(vertices)
+    edge_vertices = vertices.iloc[groups[edge]]
 
     pre_edge = get_neighbor_edge(graph, edge, vertices=vertices, column='z', direction='up', window=window, statistic=statistic)
     post_edge = get_neighbor_edge(graph, edge, vertices=vertices, column='z', direction='down', window=window, statistic=statistic)
@@ -240,9 +323,9 @@ def extend_edge(
     pre_window = pnd.DataFrame()
     post_window = pnd.DataFrame()
     if pre_edge:
-        pre_window = vertices[vertices['edge'] == pre_edge].tail(window)
+        pre_window = vertices.iloc[groups[pre_edge][-window:]]
     if post_edge:
-        post_window = vertices[vertices['edge'] == post_edge].head(window)
+        post_window = vertices.iloc[groups[post_edge][:window]]
     result = pnd.concat([pre_window, edge_vertices, post_window])
 
     return result
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 from typing import Union, Any
+import functools
 import json
+import os
 
 import click
 import fiona
+import numpy as np
 import rasterio
+import shapely
+from drapery.ops.sample import sample
 from pyproj.crs import CRS
-from shapely.geometry import shape
+from shapely.geometry import shape, LineString
+
+
+SUPPORTED_GEOM_TYPES = frozenset(
+    {'Point', 'LineString', '3D Point', '3D LineString'})
 
 
 def load_style(style: str) -> dict:
@@ -21,12 +30,25 @@ def load_style(style: str) -> dict:
 
     """
 
+    # keyed on mtime so an edited style file is re-read, not served stale
+    return _load_style_cached(style, os.path.getmtime(style))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_style_cached(style: str, mtime: float) -> dict:
     with open(style, 'r') as styles_src:
         styles = json.load(styles_src)
     return styles
 
 
 def read_crs(layer: str) -> tuple[str, CRS]:
+    # PROJ WKT parsing is slow relative to the rest of the I/O; cache the
+    # parsed CRS by path and mtime like the style files above
+    return _read_crs_cached(layer, os.path.getmtime(layer))
+
+
+@functools.lru_cache(maxsize=64)
+def _read_crs_cached(layer: str, mtime: float) -> CRS:
     with fiona.open(layer) as feature_src:
         feature_crs = CRS.from_wkt(feature_src.crs_wkt)
 
@@ -43,19 +65,80 @@ def read_geometries(feature_src: str) -> list[tuple[str, Any]]:
         feature geometry type, feature source crs as well-known text (WKT), shapely geometries
 
     """
-    supported = ['Point', 'LineString', '3D Point', '3D LineString']
-    try:
-        if feature_src.schema['geometry'] not in supported:
-            raise click.BadParameter('Geometry must be one of: {}'.format(supported))
-    except:
-        # raise click.BadParameter('Unable to obtain schema from {}'.format(layer))
-        raise click.BadParameter('Unable to obtain schema from {}'.format(feature_src.schema['geometry']))
-
-    features = [(feature.id, shape(feature['geometry'])) for feature in feature_src]
+    geometry_type = feature_src.schema.get('geometry')
+    if geometry_type is None:
+        raise click.BadParameter('Unable to obtain schema from {}'.format(feature_src))
+    if geometry_type not in SUPPORTED_GEOM_TYPES:
+        raise click.BadParameter('Geometry must be one of: {}'.format(sorted(SUPPORTED_GEOM_TYPES)))
+
+    records = list(feature_src)
+    if records and feature_src.schema['geometry'] in ('Point', '3D Point'):
+        # point layers are the numerous case; build all geometries in one
+        # vectorized call instead of one shape() per feature
+        coords = np.asarray([feature['geometry']['coordinates'] for feature in records])
+        geoms = shapely.points(coords)
+        features = [(feature.id, geom) for feature, geom in zip(records, geoms)]
+    else:
+        # surveyed layers often repeat geometries; reuse the shapely object
+        # rather than allocating a fresh one per duplicate
+        cache: dict = {}
+        features = []
+        for feature in records:
+            geom_dict = feature['geometry']
+            key = repr(geom_dict['coordinates'])
+            geom = cache.get(key)
+            if geom is None:
+                geom = cache[key] = shape(geom_dict)
+            features.append((feature.id, geom))
 
     return features
 
 
+def read_geometries_iter(feature_src: str):
+    """Yield feature source geometries one at a time
+
+    Streaming companion to read_geometries for callers that consume
+    features lazily and do not want the whole layer in memory.
+
+    Parameters:
+        feature_src: open fiona collection to read
+
+    Yields:
+        (fid, geometry) pairs
+
+    """
+    if feature_src.schema['geometry'] not in SUPPORTED_GEOM_TYPES:
+        raise click.BadParameter('Geometry must be one of: {}'.format(sorted(SUPPORTED_GEOM_TYPES)))
+
+    for feature in feature_src:
+        yield feature.id, shape(feature['geometry'])
+
+
+def drape_lines(height_src: Any, lines: list[Any]) -> list[Any]:
+    """Drape a set of LineStrings over a raster surface in one sample call
+
+    Concatenates the vertices of every line so the raster is sampled once
+    for the whole batch instead of once per line.
+
+    Parameters:
+        height_src: open rasterio dataset to sample
+        lines: shapely LineStrings to drape
+
+    Returns:
+        list of LineStrings with sampled z coordinates
+
+    """
+    if not lines:
+        return []
+    coords = [vert for line in lines for vert in line.coords]
+    if len({len(vert) for vert in coords}) > 1:
+        # mixed 2D/3D lines cannot share one sample call
+        return [LineString(sample(height_src, list(line.coords))) for line in lines]
+    triples = sample(height_src, coords)
+    bounds = np.cumsum([0] + [len(line.coords) for line in lines])
+    return [LineString(triples[i:j]) for i, j in zip(bounds[:-1], bounds[1:])]
+
+
 def read_attribute(layer: str) -> list[Any]:
     """Read feature attribute
 
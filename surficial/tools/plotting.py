@@ -1,6 +1,7 @@
 from collections import namedtuple
 from typing import Union
 
+import numpy as np
 import pandas as pnd
 from matplotlib.collections import LineCollection
 
@@ -20,10 +21,12 @@ def df_extents(df: pnd.DataFrame, xcol: str = 'x', ycol: str = 'y') -> Extents:
         bounding extents of the xy coordinates
 
     """
-    extents = Extents(df[xcol].min(),
-                      df[ycol].min(),
-                      df[xcol].max(),
-                      df[ycol].max())
+    # both columns reduce in one array scan each way instead of four
+    # separate pandas reductions; nan-aware like the pandas min/max
+    arr = df[[xcol, ycol]].to_numpy(dtype=float)
+    minx, miny = np.nanmin(arr, axis=0)
+    maxx, maxy = np.nanmax(arr, axis=0)
+    extents = Extents(minx, miny, maxx, maxy)
 
     return extents
 
@@ -39,13 +42,14 @@ def pad_extents(extents: Extents, pad: float = 0.05) -> Extents:
         padded bounding extents
 
     """
-    padx = (extents.maxx - extents.minx)*0.05
-    pady = (extents.maxy - extents.miny)*0.05
+    minx, miny, maxx, maxy = extents
+    padx = (maxx - minx)*pad
+    pady = (maxy - miny)*pad
 
-    result = Extents(extents.minx - padx,
-                     extents.miny - pady,
-                     extents.maxx + padx,
-                     extents.maxy + pady)
+    result = Extents(minx - padx,
+                     miny - pady,
+                     maxx + padx,
+                     maxy + pady)
 
     return result
 
@@ -69,7 +73,11 @@ def cols_to_linecollection(
         matplotlib LineCollection
 
     """
-    verts = [list(zip(edge[xcol], edge[ycol])) for _, edge in df.groupby('edge')]
+    # slice one coordinate array per edge; LineCollection takes ndarray
+    # segments directly, so no per-vertex tuples are built
+    xy = df[[xcol, ycol]].to_numpy(dtype=float)
+    groups = df.groupby('edge', sort=False, observed=True).indices
+    verts = [xy[positions] for positions in groups.values()]
     if style is not None:
         collection = LineCollection(verts, **style)
     else: